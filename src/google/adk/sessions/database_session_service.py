@@ -13,42 +13,76 @@
 # limitations under the License.
 from __future__ import annotations
 
-import copy
+import asyncio
 from datetime import datetime
+import functools
 import json
 import logging
-from typing import Any, Dict, List, Optional, Set
+import pickle
+from typing import Any, Callable, Dict, List, Optional, Set, TypeVar, Union
 import uuid
 
 from google.genai import types
+from pydantic import BaseModel
+from sqlalchemy import and_
+from sqlalchemy import bindparam
 from sqlalchemy import Boolean
+from sqlalchemy import cast
+from sqlalchemy import column
 from sqlalchemy import delete
 from sqlalchemy.engine.interfaces import Dialect
 from sqlalchemy import ForeignKeyConstraint
 from sqlalchemy import func
+from sqlalchemy import Index
+from sqlalchemy import insert
+from sqlalchemy import select
+from sqlalchemy import table
+from sqlalchemy import LargeBinary
 from sqlalchemy import Text
+from sqlalchemy import text
+from sqlalchemy import tuple_
+from sqlalchemy import type_coerce
+from sqlalchemy import update
 from sqlalchemy.dialects import mysql
 from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.engine import create_engine
 from sqlalchemy.engine import Engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.engine import URL
 from sqlalchemy.exc import ArgumentError
-from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.inspection import inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Column
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import Session as DatabaseSessionFactory
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import SingletonThreadPool
 from sqlalchemy.schema import MetaData
 from sqlalchemy.types import DateTime
-from sqlalchemy.types import PickleType
 from sqlalchemy.types import String
 from sqlalchemy.types import TypeDecorator
 from typing_extensions import override
 from tzlocal import get_localzone
 
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
+try:
+  from sqlalchemy.ext.asyncio import async_sessionmaker
+  from sqlalchemy.ext.asyncio import AsyncEngine
+  from sqlalchemy.ext.asyncio import AsyncSession
+  from sqlalchemy.ext.asyncio import create_async_engine
+except ImportError:
+  # Async drivers need greenlet, installed with sqlalchemy[asyncio].
+  create_async_engine = None
+
 from . import _session_util
 from ..events.event import Event
+from ..events.event_actions import EventActions
 from .base_session_service import BaseSessionService
 from .base_session_service import GetSessionConfig
 from .base_session_service import ListSessionsResponse
@@ -57,9 +91,73 @@ from .state import State
 
 logger = logging.getLogger("google_adk." + __name__)
 
+_T = TypeVar("_T")
+
 DEFAULT_MAX_KEY_LENGTH = 128
 DEFAULT_MAX_VARCHAR_LENGTH = 256
 
+# Number of event rows fetched per batch when loading a session.
+_EVENTS_YIELD_PER = 200
+
+# Pickle protocol 2+ always starts with the PROTO opcode, JSON never does.
+_PICKLE_PROTO = b"\x80"
+_PICKLED_ACTIONS_ERROR = (
+    "Event actions were pickled by an older version of ADK. Run"
+    " google.adk.sessions.database_session_service.migrate_pickled_actions"
+    " once against this database to convert them to JSON."
+)
+
+_APP_PREFIX_LEN = len(State.APP_PREFIX)
+_USER_PREFIX_LEN = len(State.USER_PREFIX)
+_TEMP_PREFIX_LEN = len(State.TEMP_PREFIX)
+
+
+def _json_dumps(value: Any) -> str:
+  """Serializes a value to a JSON string, using orjson when available."""
+  return _json_dumps_bytes(value).decode("utf-8")
+
+
+def _json_dumps_bytes(value: Any) -> bytes:
+  """Serializes a value to UTF-8 encoded JSON, using orjson when available.
+
+  Values orjson rejects, such as integers beyond 64 bits or non-str keys, fall
+  back to the stdlib json module, which raises TypeError for what it cannot
+  serialize either. datetimes and dataclasses are passed through to that
+  fallback for the same reason. Note two differences from the stdlib: orjson
+  writes NaN and Infinity as null rather than as NaN/Infinity literals, and it
+  serializes UUIDs (as strings) and plain Enum members (as their values),
+  which the stdlib rejects.
+  """
+  if orjson is not None:
+    try:
+      return orjson.dumps(
+          value,
+          option=orjson.OPT_PASSTHROUGH_DATETIME
+          | orjson.OPT_PASSTHROUGH_DATACLASS,
+      )
+    except orjson.JSONEncodeError:
+      pass
+  # The leading space is valid JSON whitespace that orjson never writes. It
+  # tells _json_loads to parse the document with the stdlib as well.
+  return b" " + json.dumps(value).encode("utf-8")
+
+
+def _json_loads(value: Any) -> Any:
+  """Deserializes a JSON string or bytes, using orjson when available.
+
+  orjson reads integers beyond 64 bits as floats, so documents written by the
+  stdlib fallback of `_json_dumps_bytes`, which start with a space, are parsed
+  with the stdlib json module, as are documents orjson rejects, such as ones
+  holding NaN literals. Any other document, e.g. one serialized by pydantic or
+  written before this fallback existed, is limited to 64-bit integers.
+  """
+  if orjson is not None and not value[:1].isspace():
+    try:
+      return orjson.loads(value)
+    except orjson.JSONDecodeError:
+      pass
+  return json.loads(value)
+
 
 class DynamicJSON(TypeDecorator):
   """A JSON-like type that uses JSONB on PostgreSQL and TEXT with JSON serialization for other databases."""
@@ -78,7 +176,7 @@ class DynamicJSON(TypeDecorator):
     if value is not None:
       if dialect.name == "postgresql":
         return value  # JSONB handles dict directly
-      return json.dumps(value)  # Serialize to JSON string for TEXT
+      return _json_dumps(value)  # Serialize to JSON string for TEXT
     return value
 
   def process_result_value(self, value, dialect: Dialect):
@@ -86,10 +184,40 @@ class DynamicJSON(TypeDecorator):
       if dialect.name == "postgresql":
         return value  # JSONB returns dict directly
       else:
-        return json.loads(value)  # Deserialize from JSON string for TEXT
+        return _json_loads(value)  # Deserialize from JSON string for TEXT
     return value
 
 
+class DynamicJSONB(TypeDecorator):
+  """A JSON-like type that uses JSONB on PostgreSQL and a binary column holding UTF-8 encoded JSON for other databases."""
+
+  impl = LargeBinary
+  cache_ok = True
+
+  def load_dialect_impl(self, dialect: Dialect):
+    if dialect.name == "postgresql":
+      return dialect.type_descriptor(postgresql.JSONB)
+    if dialect.name == "mysql":
+      # Use LONGBLOB for MySQL to address the data too long issue
+      return dialect.type_descriptor(mysql.LONGBLOB)
+    return dialect.type_descriptor(LargeBinary)
+
+  def process_bind_param(self, value, dialect: Dialect):
+    if value is None or dialect.name == "postgresql":
+      return value  # JSONB handles dict directly
+    if isinstance(value, bytes):
+      return value  # Already serialized, e.g. by pydantic's model_dump_json
+    return _json_dumps_bytes(value)  # Skip the str round-trip for BLOB
+
+  def process_result_value(self, value, dialect: Dialect):
+    if value is None or dialect.name == "postgresql":
+      return value  # JSONB returns dict directly
+    if value[:1] == _PICKLE_PROTO:
+      raise ValueError(_PICKLED_ACTIONS_ERROR)
+    # Rows written as TEXT by DynamicJSON come back as str; both decode.
+    return _json_loads(value)
+
+
 class PreciseTimestamp(TypeDecorator):
   """Represents a timestamp precise to the microsecond."""
 
@@ -123,9 +251,7 @@ class StorageSession(Base):
       default=lambda: str(uuid.uuid4()),
   )
 
-  state: MutableDict[str, Any] = Column(
-      MutableDict.as_mutable(DynamicJSON), default={}
-  )
+  state: Dict[str, Any] = Column(DynamicJSONB, default={})
 
   create_time: datetime = Column(DateTime(), default=func.now())
   update_time: datetime = Column(
@@ -168,14 +294,14 @@ class StorageEvent(Base):
   timestamp: datetime = Column(
       PreciseTimestamp, default=func.now()
   )
-  content: Dict[str, Any] = Column(DynamicJSON, nullable=True)
-  actions: MutableDict[str, Any] = Column(PickleType)
+  content: Dict[str, Any] = Column(DynamicJSONB, nullable=True)
+  actions: Dict[str, Any] = Column(DynamicJSONB, nullable=True)
 
   long_running_tool_ids_json: Optional[str] = Column(
       Text, nullable=True
   )
   grounding_metadata: Dict[str, Any] = Column(
-      DynamicJSON, nullable=True
+      DynamicJSONB, nullable=True
   )
   partial: bool = Column(Boolean, nullable=True)
   turn_complete: bool = Column(Boolean, nullable=True)
@@ -196,22 +322,46 @@ class StorageEvent(Base):
           ["sessions.app_name", "sessions.user_id", "sessions.id"],
           ondelete="CASCADE",
       ),
+      # Serves the per-session, timestamp-ordered reads in get_session.
+      Index(
+          "ix_events_session_timestamp",
+          "app_name",
+          "user_id",
+          "session_id",
+          "timestamp",
+          postgresql_include=["id"],
+      ),
   )
 
   @property
   def long_running_tool_ids(self) -> Set[str]:
-    return (
-        set(json.loads(self.long_running_tool_ids_json))
-        if self.long_running_tool_ids_json
-        else set()
-    )
+    return _decode_long_running_tool_ids(self.long_running_tool_ids_json)
 
   @long_running_tool_ids.setter
   def long_running_tool_ids(self, value: Set[str]):
     if value is None:
       self.long_running_tool_ids_json = None
     else:
-      self.long_running_tool_ids_json = json.dumps(list(value))
+      self.long_running_tool_ids_json = _json_dumps(list(value))
+
+
+# The StorageEvent columns read by get_session, in unpacking order.
+_EVENT_COLUMNS = (
+    StorageEvent.id,
+    StorageEvent.author,
+    StorageEvent.branch,
+    StorageEvent.invocation_id,
+    StorageEvent.content,
+    StorageEvent.actions,
+    StorageEvent.timestamp,
+    StorageEvent.long_running_tool_ids_json,
+    StorageEvent.grounding_metadata,
+    StorageEvent.partial,
+    StorageEvent.turn_complete,
+    StorageEvent.error_code,
+    StorageEvent.error_message,
+    StorageEvent.interrupted,
+)
 
 
 class StorageAppState(Base):
@@ -222,9 +372,7 @@ class StorageAppState(Base):
   app_name: str = Column(
       String(DEFAULT_MAX_KEY_LENGTH), primary_key=True
   )
-  state: MutableDict[str, Any] = Column(
-      MutableDict.as_mutable(DynamicJSON), default={}
-  )
+  state: Dict[str, Any] = Column(DynamicJSONB, default={})
   update_time: datetime = Column(
       DateTime(), default=func.now(), onupdate=func.now()
   )
@@ -244,9 +392,7 @@ class StorageUserState(Base):
   user_id: str = Column(
       String(DEFAULT_MAX_KEY_LENGTH), primary_key=True
   )
-  state: MutableDict[str, Any] = Column(
-      MutableDict.as_mutable(DynamicJSON), default={}
-  )
+  state: Dict[str, Any] = Column(DynamicJSONB, default={})
   update_time: datetime = Column(
       DateTime(), default=func.now(), onupdate=func.now()
   )
@@ -259,13 +405,33 @@ class DatabaseSessionService(BaseSessionService):
   """A session service that uses a database for storage."""
 
   def __init__(self, db_url: str, **kwargs: Any):
-    """Initializes the database session service with a database URL."""
+    """Initializes the database session service with a database URL.
+
+    URLs with an async driver (e.g. `postgresql+asyncpg://`) use an async
+    engine; other URLs run their blocking database calls in the default
+    executor.
+
+    Args:
+      db_url: The database URL to connect to.
+      **kwargs: Extra arguments passed to `create_engine` (or
+        `create_async_engine`). They override the pool and executemany
+        defaults chosen by this service.
+    """
     # 1. Create DB engine for db connection
     # 2. Create all tables based on schema
     # 3. Initialize all properties
 
     try:
-      db_engine = create_engine(db_url, **kwargs)
+      url = make_url(db_url)
+      engine_kwargs = _default_engine_kwargs(url, kwargs)
+      # Async drivers (e.g. postgresql+asyncpg, sqlite+aiosqlite) get an async
+      # engine so database round-trips never block the event loop.
+      is_async = url.get_dialect().is_async
+      if is_async and create_async_engine is None:
+        raise ImportError("sqlalchemy[asyncio] is required for async drivers.")
+      db_engine = (create_async_engine if is_async else create_engine)(
+          db_url, **{**engine_kwargs, **kwargs}
+      )
     except Exception as e:
       if isinstance(e, ArgumentError):
         raise ValueError(
@@ -283,18 +449,72 @@ class DatabaseSessionService(BaseSessionService):
     local_timezone = get_localzone()
     logger.info(f"Local timezone: {local_timezone}")
 
-    self.db_engine: Engine = db_engine
+    self.db_engine: Union[Engine, AsyncEngine] = db_engine
     self.metadata: MetaData = MetaData()
-    self.inspector = inspect(self.db_engine)
+    self._is_async = is_async
+    self._tables_created = False
 
     # DB session factory method
-    self.database_session_factory: sessionmaker[DatabaseSessionFactory] = (
-        sessionmaker(bind=self.db_engine)
+    self.database_session_factory: Union[
+        sessionmaker[DatabaseSessionFactory], async_sessionmaker[AsyncSession]
+    ]
+    if is_async:
+      # Inspection and table creation need an awaitable connection, so on
+      # async engines the tables are created on first use instead.
+      self.inspector = None
+      self.database_session_factory = async_sessionmaker(bind=self.db_engine)
+      self._run_in_executor = False
+      # Created on first use, since before Python 3.10 asyncio.Lock binds to
+      # the event loop that is current when it is constructed.
+      self._create_tables_lock: Optional[asyncio.Lock] = None
+    else:
+      self.inspector = inspect(self.db_engine)
+      self.database_session_factory = sessionmaker(bind=self.db_engine)
+
+      # Uncomment to recreate DB every time
+      # Base.metadata.drop_all(self.db_engine)
+      Base.metadata.create_all(self.db_engine)
+      self._tables_created = True
+
+      # SingletonThreadPool (SQLite in-memory) keeps one connection, and so
+      # one database, per thread; those engines stay on the calling thread.
+      self._run_in_executor = not isinstance(
+          self.db_engine.pool, SingletonThreadPool
+      )
+
+  async def _run(self, fn: Callable[[DatabaseSessionFactory], _T]) -> _T:
+    """Runs `fn` with a new database session without blocking the event loop.
+
+    On async engines `fn` runs through `AsyncSession.run_sync`, which drives
+    the async driver from synchronous ORM code. On sync engines it runs in
+    the default executor.
+    """
+    if self._is_async:
+      await self._create_tables()
+      async with self.database_session_factory() as session_factory:
+        return await session_factory.run_sync(fn)
+    if not self._run_in_executor:
+      return self._run_in_session(fn)
+    return await asyncio.get_running_loop().run_in_executor(
+        None, self._run_in_session, fn
     )
 
-    # Uncomment to recreate DB every time
-    # Base.metadata.drop_all(self.db_engine)
-    Base.metadata.create_all(self.db_engine)
+  def _run_in_session(self, fn: Callable[[DatabaseSessionFactory], _T]) -> _T:
+    with self.database_session_factory() as session_factory:
+      return fn(session_factory)
+
+  async def _create_tables(self) -> None:
+    """Creates all tables on an async engine, once."""
+    if self._tables_created:
+      return
+    if self._create_tables_lock is None:
+      self._create_tables_lock = asyncio.Lock()
+    async with self._create_tables_lock:
+      if self._tables_created:
+        return
+      async with self.db_engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+      self._tables_created = True
 
   @override
   async def create_session(
@@ -304,6 +524,25 @@ class DatabaseSessionService(BaseSessionService):
       user_id: str,
       state: Optional[Dict[str, Any]] = None,
       session_id: Optional[str] = None,
+  ) -> Session:
+    return await self._run(
+        functools.partial(
+            self._create_session,
+            app_name=app_name,
+            user_id=user_id,
+            state=state,
+            session_id=session_id,
+        )
+    )
+
+  def _create_session(
+      self,
+      session_factory: DatabaseSessionFactory,
+      *,
+      app_name: str,
+      user_id: str,
+      state: Optional[Dict[str, Any]],
+      session_id: Optional[str],
   ) -> Session:
     # 1. Populate states.
     # 2. Build storage session object
@@ -311,64 +550,96 @@ class DatabaseSessionService(BaseSessionService):
     # 4. Build the session object with generated id
     # 5. Return the session
 
-    with self.database_session_factory() as session_factory:
-
-      # Fetch app and user states from storage
-      storage_app_state = session_factory.get(StorageAppState, (app_name))
-      storage_user_state = session_factory.get(
-          StorageUserState, (app_name, user_id)
-      )
-
-      app_state = storage_app_state.state if storage_app_state else {}
-      user_state = storage_user_state.state if storage_user_state else {}
-
-      # Create state tables if not exist
-      if not storage_app_state:
-        storage_app_state = StorageAppState(app_name=app_name, state={})
-        session_factory.add(storage_app_state)
-      if not storage_user_state:
-        storage_user_state = StorageUserState(
-            app_name=app_name, user_id=user_id, state={}
-        )
-        session_factory.add(storage_user_state)
+    # Fetch app and user states from storage
+    storage_app_state, storage_user_state = _get_storage_states(
+        session_factory, app_name, user_id
+    )
 
-      # Extract state deltas
-      app_state_delta, user_state_delta, session_state = _extract_state_delta(
-          state
+    # Create state tables if not exist
+    if not storage_app_state or not storage_user_state:
+      dialect_name = self.db_engine.dialect.name
+      insert_app_state = _insert_ignoring_conflicts(
+          dialect_name, StorageAppState, app_name=app_name, state={}
       )
-
-      # Apply state delta
-      app_state.update(app_state_delta)
-      user_state.update(user_state_delta)
-
-      # Store app and user state
-      if app_state_delta:
-        storage_app_state.state = app_state
-      if user_state_delta:
-        storage_user_state.state = user_state
-
-      # Store the session
-      storage_session = StorageSession(
+      insert_user_state = _insert_ignoring_conflicts(
+          dialect_name,
+          StorageUserState,
           app_name=app_name,
           user_id=user_id,
-          id=session_id,
-          state=session_state,
+          state={},
       )
-      session_factory.add(storage_session)
-      session_factory.commit()
+      if insert_app_state is not None:
+        # Inserts that skip existing rows, so concurrent calls creating the
+        # first session of an app or user do not collide.
+        session_factory.execute(insert_app_state)
+        session_factory.execute(insert_user_state)
+        storage_app_state, storage_user_state = _get_storage_states(
+            session_factory, app_name, user_id
+        )
+      else:
+        if not storage_app_state:
+          storage_app_state = StorageAppState(app_name=app_name, state={})
+          session_factory.add(storage_app_state)
+        if not storage_user_state:
+          storage_user_state = StorageUserState(
+              app_name=app_name, user_id=user_id, state={}
+          )
+          session_factory.add(storage_user_state)
 
-      session_factory.refresh(storage_session)
+    app_state = storage_app_state.state
+    user_state = storage_user_state.state
 
-      # Merge states for response
-      merged_state = _merge_state(app_state, user_state, session_state)
-      session = Session(
-          app_name=str(storage_session.app_name),
-          user_id=str(storage_session.user_id),
-          id=str(storage_session.id),
-          state=merged_state,
-          last_update_time=storage_session.update_time.timestamp(),
+    # Extract state deltas
+    app_state_delta, user_state_delta, session_state = _extract_state_delta(
+        state
+    )
+
+    # Apply state delta. The state columns do not track in-place mutation,
+    # so new dicts are built and assigned.
+    app_state = {**app_state, **app_state_delta}
+    user_state = {**user_state, **user_state_delta}
+
+    # Store app and user state
+    if app_state_delta:
+      storage_app_state.state = app_state
+    if user_state_delta:
+      storage_user_state.state = user_state
+
+    # Store the session, reading back the update time in the same
+    # round-trip where the database supports RETURNING
+    if session_id is None:
+      session_id = str(uuid.uuid4())
+    insert_session = insert(StorageSession).values(
+        app_name=app_name,
+        user_id=user_id,
+        id=session_id,
+        state=session_state,
+    )
+    if self.db_engine.dialect.insert_returning:
+      update_time = session_factory.scalar(
+          insert_session.returning(StorageSession.update_time)
+      )
+    else:
+      session_factory.execute(insert_session)
+      update_time = session_factory.scalar(
+          select(StorageSession.update_time).where(
+              StorageSession.app_name == app_name,
+              StorageSession.user_id == user_id,
+              StorageSession.id == session_id,
+          )
       )
-      return session
+    session_factory.commit()
+
+    # Merge states for response
+    merged_state = _merge_state(app_state, user_state, session_state)
+    session = Session(
+        app_name=app_name,
+        user_id=user_id,
+        id=session_id,
+        state=merged_state,
+        last_update_time=update_time.timestamp(),
+    )
+    return session
 
   @override
   async def get_session(
@@ -378,115 +649,189 @@ class DatabaseSessionService(BaseSessionService):
       user_id: str,
       session_id: str,
       config: Optional[GetSessionConfig] = None,
+  ) -> Optional[Session]:
+    return await self._run(
+        functools.partial(
+            self._get_session,
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            config=config,
+        )
+    )
+
+  def _get_session(
+      self,
+      session_factory: DatabaseSessionFactory,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[GetSessionConfig],
   ) -> Optional[Session]:
     # 1. Get the storage session entry from session table
     # 2. Get all the events based on session id and filtering config
     # 3. Convert and return the session
-    with self.database_session_factory() as session_factory:
-      storage_session = session_factory.get(
-          StorageSession, (app_name, user_id, session_id)
-      )
-      if storage_session is None:
-        return None
+    row = _get_storage_session_with_states(
+        session_factory, app_name, user_id, session_id
+    )
+    if row is None:
+      return None
+    storage_session, storage_app_state, storage_user_state = row
 
-      if config and config.after_timestamp:
-        after_dt = datetime.fromtimestamp(config.after_timestamp)
-        timestamp_filter = StorageEvent.timestamp >= after_dt
-      else:
-        timestamp_filter = True
-
-      storage_events = (
-          session_factory.query(StorageEvent)
-          .filter(StorageEvent.session_id == storage_session.id)
-          .filter(timestamp_filter)
-          .order_by(StorageEvent.timestamp.desc())
-          .limit(
-              config.num_recent_events
-              if config and config.num_recent_events
-              else None
-          )
-          .all()
+    if config and config.after_timestamp:
+      after_dt = datetime.fromtimestamp(config.after_timestamp)
+      timestamp_filter = StorageEvent.timestamp >= after_dt
+    else:
+      timestamp_filter = True
+
+    # Select plain columns rather than StorageEvent entities so rows skip ORM
+    # instance construction and the identity map.
+    events_stmt = select(*_EVENT_COLUMNS).where(
+        StorageEvent.app_name == app_name,
+        StorageEvent.user_id == user_id,
+        StorageEvent.session_id == session_id,
+        timestamp_filter,
+    )
+    if config and config.num_recent_events:
+      # Pick the most recent events first, then return them oldest first.
+      recent_events = (
+          events_stmt.order_by(StorageEvent.timestamp.desc())
+          .limit(config.num_recent_events)
+          .subquery()
       )
-
-      # Fetch states from storage
-      storage_app_state = session_factory.get(StorageAppState, (app_name))
-      storage_user_state = session_factory.get(
-          StorageUserState, (app_name, user_id)
+      events_stmt = select(recent_events).order_by(
+          recent_events.c.timestamp.asc()
       )
+    else:
+      events_stmt = events_stmt.order_by(StorageEvent.timestamp.asc())
+
+    app_state = storage_app_state.state if storage_app_state else {}
+    user_state = storage_user_state.state if storage_user_state else {}
+    session_state = storage_session.state
+
+    # Merge states
+    merged_state = _merge_state(app_state, user_state, session_state)
+
+    # Convert storage session to session
+    session = Session(
+        app_name=app_name,
+        user_id=user_id,
+        id=session_id,
+        state=merged_state,
+        last_update_time=storage_session.update_time.timestamp(),
+    )
 
-      app_state = storage_app_state.state if storage_app_state else {}
-      user_state = storage_user_state.state if storage_user_state else {}
-      session_state = storage_session.state
-
-      # Merge states
-      merged_state = _merge_state(app_state, user_state, session_state)
-
-      # Convert storage session to session
-      session = Session(
-          app_name=app_name,
-          user_id=user_id,
-          id=session_id,
-          state=merged_state,
-          last_update_time=storage_session.update_time.timestamp(),
-      )
-      session.events = [
+    # Stream the rows in batches so long histories are never fully held in
+    # memory alongside the converted events. Timestamps are stored as naive
+    # local time, so they are converted to epoch seconds here rather than
+    # with the database's epoch functions, which would treat them as UTC.
+    rows = session_factory.execute(
+        events_stmt, execution_options={"yield_per": _EVENTS_YIELD_PER}
+    )
+    for (
+        event_id,
+        author,
+        branch,
+        invocation_id,
+        content,
+        actions,
+        timestamp,
+        long_running_tool_ids_json,
+        grounding_metadata,
+        partial,
+        turn_complete,
+        error_code,
+        error_message,
+        interrupted,
+    ) in rows:
+      session.events.append(
           Event(
-              id=e.id,
-              author=e.author,
-              branch=e.branch,
-              invocation_id=e.invocation_id,
-              content=_session_util.decode_content(e.content),
-              actions=e.actions,
-              timestamp=e.timestamp.timestamp(),
-              long_running_tool_ids=e.long_running_tool_ids,
+              id=event_id,
+              author=author,
+              branch=branch,
+              invocation_id=invocation_id,
+              content=_session_util.decode_content(content),
+              actions=_decode_actions(actions),
+              timestamp=timestamp.timestamp(),
+              long_running_tool_ids=_decode_long_running_tool_ids(
+                  long_running_tool_ids_json
+              ),
               grounding_metadata=_session_util.decode_grounding_metadata(
-                  e.grounding_metadata
+                  grounding_metadata
               ),
-              partial=e.partial,
-              turn_complete=e.turn_complete,
-              error_code=e.error_code,
-              error_message=e.error_message,
-              interrupted=e.interrupted,
+              partial=partial,
+              turn_complete=turn_complete,
+              error_code=error_code,
+              error_message=error_message,
+              interrupted=interrupted,
           )
-          for e in reversed(storage_events)
-      ]
+      )
     return session
 
   @override
   async def list_sessions(
       self, *, app_name: str, user_id: str
   ) -> ListSessionsResponse:
-    with self.database_session_factory() as session_factory:
-      results = (
-          session_factory.query(StorageSession)
-          .filter(StorageSession.app_name == app_name)
-          .filter(StorageSession.user_id == user_id)
-          .all()
-      )
-      sessions = []
-      for storage_session in results:
-        session = Session(
-            app_name=app_name,
-            user_id=user_id,
-            id=storage_session.id,
-            state={},
-            last_update_time=storage_session.update_time.timestamp(),
+    return await self._run(
+        functools.partial(
+            self._list_sessions, app_name=app_name, user_id=user_id
         )
-        sessions.append(session)
-      return ListSessionsResponse(sessions=sessions)
+    )
+
+  def _list_sessions(
+      self,
+      session_factory: DatabaseSessionFactory,
+      *,
+      app_name: str,
+      user_id: str,
+  ) -> ListSessionsResponse:
+    results = (
+        session_factory.query(StorageSession)
+        .filter(StorageSession.app_name == app_name)
+        .filter(StorageSession.user_id == user_id)
+        .all()
+    )
+    sessions = []
+    for storage_session in results:
+      session = Session(
+          app_name=app_name,
+          user_id=user_id,
+          id=storage_session.id,
+          state={},
+          last_update_time=storage_session.update_time.timestamp(),
+      )
+      sessions.append(session)
+    return ListSessionsResponse(sessions=sessions)
 
   @override
   async def delete_session(
       self, app_name: str, user_id: str, session_id: str
   ) -> None:
-    with self.database_session_factory() as session_factory:
-      stmt = delete(StorageSession).where(
-          StorageSession.app_name == app_name,
-          StorageSession.user_id == user_id,
-          StorageSession.id == session_id,
-      )
-      session_factory.execute(stmt)
-      session_factory.commit()
+    await self._run(
+        functools.partial(
+            self._delete_session,
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+        )
+    )
+
+  def _delete_session(
+      self,
+      session_factory: DatabaseSessionFactory,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+  ) -> None:
+    stmt = delete(StorageSession).where(
+        StorageSession.app_name == app_name,
+        StorageSession.user_id == user_id,
+        StorageSession.id == session_id,
+    )
+    session_factory.execute(stmt)
+    session_factory.commit()
 
   @override
   async def append_event(self, session: Session, event: Event) -> Event:
@@ -495,93 +840,288 @@ class DatabaseSessionService(BaseSessionService):
     if event.partial:
       return event
 
+    await self.append_events(session=session, events=[event])
+    return event
+
+  async def append_events(
+      self, session: Session, events: List[Event]
+  ) -> List[Event]:
+    """Appends multiple events to a session in a single transaction.
+
+    All non-partial events are written with one bulk INSERT, so callers that
+    produce many events at once avoid a round-trip per event. State deltas
+    are applied in order, exactly as if each event had been appended with
+    `append_event`.
+
+    Args:
+      session: The session to append the events to.
+      events: The events to append, in order.
+
+    Returns:
+      The events that were passed in.
+    """
+    storage_events = [event for event in events if not event.partial]
+    if not storage_events:
+      return events
+
+    await self._run(
+        functools.partial(
+            self._append_events, session=session, events=storage_events
+        )
+    )
+
+    # Also update the in-memory session
+    for event in storage_events:
+      await super().append_event(session=session, event=event)
+    return events
+
+  def _append_events(
+      self,
+      session_factory: DatabaseSessionFactory,
+      *,
+      session: Session,
+      events: List[Event],
+  ) -> None:
     # 1. Check if timestamp is stale
     # 2. Update session attributes based on event config
-    # 3. Store event to table
-    with self.database_session_factory() as session_factory:
-      storage_session = session_factory.get(
-          StorageSession, (session.app_name, session.user_id, session.id)
-      )
-
-      if storage_session.update_time.timestamp() > session.last_update_time:
-        raise ValueError(
-            "The last_update_time provided in the session object"
-            f" {datetime.fromtimestamp(session.last_update_time):'%Y-%m-%d %H:%M:%S'} is"
-            " earlier than the update_time in the storage_session"
-            f" {storage_session.update_time:'%Y-%m-%d %H:%M:%S'}. Please check"
-            " if it is a stale session."
+    # 3. Store events to table
+    # Fetch the session and states from storage in one round-trip
+    storage_session, storage_app_state, storage_user_state = (
+        _get_storage_session_with_states(
+            session_factory, session.app_name, session.user_id, session.id
         )
+    )
 
-      # Fetch states from storage
-      storage_app_state = session_factory.get(
-          StorageAppState, (session.app_name)
-      )
-      storage_user_state = session_factory.get(
-          StorageUserState, (session.app_name, session.user_id)
+    if storage_session.update_time.timestamp() > session.last_update_time:
+      raise ValueError(
+          "The last_update_time provided in the session object"
+          f" {datetime.fromtimestamp(session.last_update_time):'%Y-%m-%d %H:%M:%S'} is"
+          " earlier than the update_time in the storage_session"
+          f" {storage_session.update_time:'%Y-%m-%d %H:%M:%S'}. Please check"
+          " if it is a stale session."
       )
 
-      app_state = storage_app_state.state if storage_app_state else {}
-      user_state = storage_user_state.state if storage_user_state else {}
-      session_state = storage_session.state
-
-      # Extract state delta
-      app_state_delta = {}
-      user_state_delta = {}
-      session_state_delta = {}
-      if event.actions:
-        if event.actions.state_delta:
-          app_state_delta, user_state_delta, session_state_delta = (
-              _extract_state_delta(event.actions.state_delta)
-          )
-
-      # Merge state and update storage
+    # Extract state delta
+    app_state_delta = {}
+    user_state_delta = {}
+    session_state_delta = {}
+    for event in events:
+      if event.actions and event.actions.state_delta:
+        event_app_delta, event_user_delta, event_session_delta = (
+            _extract_state_delta(event.actions.state_delta)
+        )
+        app_state_delta.update(event_app_delta)
+        user_state_delta.update(event_user_delta)
+        session_state_delta.update(event_session_delta)
+
+    # Merge state and update storage
+    is_postgresql = self.db_engine.dialect.name == "postgresql"
+    if is_postgresql:
+      # Merge the deltas into the JSONB columns on the server, so only the
+      # changed keys are sent instead of re-serializing the whole state.
       if app_state_delta:
-        app_state.update(app_state_delta)
-        storage_app_state.state = app_state
+        session_factory.execute(
+            update(StorageAppState)
+            .where(StorageAppState.app_name == session.app_name)
+            .values(state=_jsonb_merge(StorageAppState.state, app_state_delta))
+        )
       if user_state_delta:
-        user_state.update(user_state_delta)
-        storage_user_state.state = user_state
-      if session_state_delta:
-        session_state.update(session_state_delta)
-        storage_session.state = session_state
-
-      storage_event = StorageEvent(
-          id=event.id,
-          invocation_id=event.invocation_id,
-          author=event.author,
-          branch=event.branch,
-          actions=event.actions,
-          session_id=session.id,
-          app_name=session.app_name,
-          user_id=session.user_id,
-          timestamp=datetime.fromtimestamp(event.timestamp),
-          long_running_tool_ids=event.long_running_tool_ids,
-          partial=event.partial,
-          turn_complete=event.turn_complete,
-          error_code=event.error_code,
-          error_message=event.error_message,
-          interrupted=event.interrupted,
-      )
-      if event.content:
-        storage_event.content = event.content.model_dump(
-            exclude_none=True, mode="json"
+        session_factory.execute(
+            update(StorageUserState)
+            .where(
+                StorageUserState.app_name == session.app_name,
+                StorageUserState.user_id == session.user_id,
+            )
+            .values(
+                state=_jsonb_merge(StorageUserState.state, user_state_delta)
+            )
         )
-      if event.grounding_metadata:
-        storage_event.grounding_metadata = event.grounding_metadata.model_dump(
-            exclude_none=True, mode="json"
+      if session_state_delta:
+        session_factory.execute(
+            update(StorageSession)
+            .where(
+                StorageSession.app_name == session.app_name,
+                StorageSession.user_id == session.user_id,
+                StorageSession.id == session.id,
+            )
+            .values(
+                state=_jsonb_merge(StorageSession.state, session_state_delta)
+            )
         )
+    else:
+      # The state columns do not track in-place mutation, so new dicts are
+      # built and assigned.
+      if app_state_delta:
+        storage_app_state.state = {**storage_app_state.state, **app_state_delta}
+      if user_state_delta:
+        storage_user_state.state = {
+            **storage_user_state.state,
+            **user_state_delta,
+        }
+      if session_state_delta:
+        storage_session.state = {
+            **storage_session.state,
+            **session_state_delta,
+        }
+
+    # Binary JSON columns accept bytes as-is, so pydantic can serialize
+    # straight to JSON; JSONB on PostgreSQL needs a dict.
+    dump_json = not is_postgresql
+    session_factory.execute(
+        insert(StorageEvent),
+        [_to_storage_event_params(session, e, dump_json) for e in events],
+    )
 
-      session_factory.add(storage_event)
+    session_factory.commit()
+    session_factory.refresh(storage_session)
+
+    # Update timestamp with commit time
+    session.last_update_time = storage_session.update_time.timestamp()
+
+
+def _get_storage_session_with_states(
+    session_factory: DatabaseSessionFactory,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+):
+  """Fetches a storage session with its app and user states in one query.
+
+  Returns:
+    A `(storage_session, storage_app_state, storage_user_state)` row, where
+    either state may be None, or None if the session does not exist.
+  """
+  return session_factory.execute(
+      select(StorageSession, StorageAppState, StorageUserState)
+      .outerjoin(
+          StorageAppState,
+          StorageAppState.app_name == StorageSession.app_name,
+      )
+      .outerjoin(
+          StorageUserState,
+          and_(
+              StorageUserState.app_name == StorageSession.app_name,
+              StorageUserState.user_id == StorageSession.user_id,
+          ),
+      )
+      .where(
+          StorageSession.app_name == app_name,
+          StorageSession.user_id == user_id,
+          StorageSession.id == session_id,
+      )
+  ).one_or_none()
+
+
+def _get_storage_states(
+    session_factory: DatabaseSessionFactory, app_name: str, user_id: str
+):
+  """Fetches the app and user states, either of which may be None.
+
+  A user state is only ever created together with its app state, so a single
+  outer join from the app state finds both.
+  """
+  row = session_factory.execute(
+      select(StorageAppState, StorageUserState)
+      .outerjoin(
+          StorageUserState,
+          and_(
+              StorageUserState.app_name == StorageAppState.app_name,
+              StorageUserState.user_id == user_id,
+          ),
+      )
+      .where(StorageAppState.app_name == app_name)
+  ).one_or_none()
+  if row is None:
+    return None, session_factory.get(StorageUserState, (app_name, user_id))
+  return row
+
+
+def _insert_ignoring_conflicts(dialect_name: str, entity, **values: Any):
+  """Returns an INSERT of `values` that does nothing if the row exists.
+
+  Returns None on dialects without an upsert construct.
+  """
+  if dialect_name == "postgresql":
+    return postgresql.insert(entity).values(**values).on_conflict_do_nothing()
+  if dialect_name == "sqlite":
+    return sqlite.insert(entity).values(**values).on_conflict_do_nothing()
+  if dialect_name in ("mysql", "mariadb"):
+    stmt = mysql.insert(entity).values(**values)
+    # Re-assigning the key to itself leaves an existing row untouched.
+    return stmt.on_duplicate_key_update(app_name=stmt.inserted.app_name)
+  return None
+
+
+def _default_engine_kwargs(url: URL, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+  """Returns the default `create_engine` arguments for a database URL.
+
+  Connection pools hand out the most recently used connection first and
+  validate it before use, so warm connections are reused under load and stale
+  ones are replaced. On psycopg2, executemany is batched with
+  `execute_values()`.
+  """
+  engine_kwargs: Dict[str, Any] = {"insertmanyvalues_page_size": 1000}
+  if url.get_driver_name() == "psycopg2":
+    engine_kwargs["executemany_mode"] = "values_plus_batch"
+  if "pool" in kwargs:
+    # A pre-built pool does not accept any pool arguments.
+    return engine_kwargs
+
+  engine_kwargs["pool_pre_ping"] = True
+  engine_kwargs["pool_recycle"] = 3600
+  pool_class = kwargs.get("poolclass") or url.get_dialect().get_pool_class(url)
+  if issubclass(pool_class, QueuePool):
+    # Only queue pools support LIFO ordering, e.g. not SQLite in-memory.
+    engine_kwargs["pool_use_lifo"] = True
+  return engine_kwargs
+
+
+def _to_storage_event_params(
+    session: Session, event: Event, dump_json: bool
+) -> Dict[str, Any]:
+  """Builds the insert parameters of a storage event for an event.
+
+  Args:
+    session: The session the event belongs to.
+    event: The event to store.
+    dump_json: Whether to serialize the JSON columns straight to bytes with
+      pydantic's `model_dump_json`, skipping the intermediate dict. Only valid
+      when the JSON columns are binary, i.e. not on PostgreSQL.
+  """
+  dump = _dump_model_json if dump_json else _dump_model
+  return {
+      "id": event.id,
+      "invocation_id": event.invocation_id,
+      "author": event.author,
+      "branch": event.branch,
+      "actions": dump(event.actions) if event.actions else None,
+      "session_id": session.id,
+      "app_name": session.app_name,
+      "user_id": session.user_id,
+      "timestamp": datetime.fromtimestamp(event.timestamp),
+      "content": dump(event.content) if event.content else None,
+      "long_running_tool_ids_json": (
+          _json_dumps(list(event.long_running_tool_ids))
+          if event.long_running_tool_ids is not None
+          else None
+      ),
+      "grounding_metadata": (
+          dump(event.grounding_metadata) if event.grounding_metadata else None
+      ),
+      "partial": event.partial,
+      "turn_complete": event.turn_complete,
+      "error_code": event.error_code,
+      "error_message": event.error_message,
+      "interrupted": event.interrupted,
+  }
 
-      session_factory.commit()
-      session_factory.refresh(storage_session)
 
-      # Update timestamp with commit time
-      session.last_update_time = storage_session.update_time.timestamp()
+def _dump_model(model: BaseModel) -> Dict[str, Any]:
+  return model.model_dump(exclude_none=True, mode="json")
 
-    # Also update the in-memory session
-    await super().append_event(session=session, event=event)
-    return event
+
+def _dump_model_json(model: BaseModel) -> bytes:
+  return model.model_dump_json(exclude_none=True).encode("utf-8")
 
 
 def convert_event(event: StorageEvent) -> Event:
@@ -592,31 +1132,170 @@ def convert_event(event: StorageEvent) -> Event:
       branch=event.branch,
       invocation_id=event.invocation_id,
       content=event.content,
-      actions=event.actions,
+      actions=_decode_actions(event.actions),
       timestamp=event.timestamp.timestamp(),
   )
 
 
+def migrate_pickled_actions(
+    db_engine: Engine, batch_size: int = _EVENTS_YIELD_PER
+) -> int:
+  """Rewrites event actions pickled by older versions as JSON.
+
+  Earlier releases stored `StorageEvent.actions` with `PickleType`. This walks
+  the event rows in batches of `batch_size`, unpickles the actions that are
+  still in pickle format and writes them back as JSON. Rows that already hold
+  JSON are left untouched, so it is safe to run more than once. Only run it
+  against a trusted database, since unpickling can execute arbitrary code.
+
+  On PostgreSQL the `BYTEA` column is replaced by a `JSONB` column as part of
+  the same transaction.
+
+  Args:
+    db_engine: The engine bound to the database to migrate.
+    batch_size: The number of event rows to read and write per round trip.
+
+  Returns:
+    The number of event rows that were migrated.
+
+  Raises:
+    ValueError: If, on PostgreSQL, a `BYTEA` actions value is not a pickle and
+      so could not be converted to `JSONB`.
+  """
+  events = StorageEvent.__table__
+  primary_key = [
+      events.c.id,
+      events.c.app_name,
+      events.c.user_id,
+      events.c.session_id,
+  ]
+  is_postgresql = db_engine.dialect.name == "postgresql"
+  if is_postgresql:
+    actions_column = next(
+        c
+        for c in inspect(db_engine).get_columns("events")
+        if c["name"] == "actions"
+    )
+    if not isinstance(actions_column["type"], LargeBinary):
+      return 0
+    # The converted actions go to a new column, which replaces the old one
+    # once every row has been read.
+    target_column = "actions_json"
+  else:
+    target_column = "actions"
+  target = table(
+      "events",
+      *(column(c.name) for c in primary_key),
+      column(target_column, DynamicJSONB),
+  )
+  update_actions = (
+      update(target)
+      .where(
+          *(target.c[c.name] == bindparam(f"pk_{c.name}") for c in primary_key)
+      )
+      .values({target_column: bindparam("migrated_actions")})
+  )
+
+  migrated = 0
+  with db_engine.begin() as connection:
+    if is_postgresql:
+      connection.execute(
+          text("ALTER TABLE events ADD COLUMN actions_json JSONB")
+      )
+
+    last_key = None
+    while True:
+      query = (
+          select(*primary_key, type_coerce(events.c.actions, LargeBinary))
+          .order_by(*primary_key)
+          .limit(batch_size)
+      )
+      if last_key is not None:
+        query = query.where(tuple_(*primary_key) > tuple_(*last_key))
+      rows = connection.execute(query).all()
+      if not rows:
+        break
+      last_key = rows[-1][:-1]
+
+      params = []
+      for row in rows:
+        raw_actions = row[-1]
+        if raw_actions is None:
+          continue
+        if raw_actions[:1] != _PICKLE_PROTO:
+          if is_postgresql:
+            raise ValueError(
+                f"Event {row[0]} holds actions that are not pickled and"
+                " cannot be converted to JSONB."
+            )
+          continue
+        actions = pickle.loads(raw_actions)
+        param = {f"pk_{c.name}": value for c, value in zip(primary_key, row)}
+        param["migrated_actions"] = (
+            actions.model_dump(exclude_none=True, mode="json")
+            if actions
+            else None
+        )
+        params.append(param)
+      if params:
+        connection.execute(update_actions, params)
+        migrated += len(params)
+
+    if is_postgresql:
+      connection.execute(text("ALTER TABLE events DROP COLUMN actions"))
+      connection.execute(
+          text("ALTER TABLE events RENAME COLUMN actions_json TO actions")
+      )
+  return migrated
+
+
+def _jsonb_merge(column, delta: Dict[str, Any]):
+  """Returns `column || delta`, a top-level JSONB merge like `dict.update`."""
+  return column.op("||")(cast(delta, postgresql.JSONB))
+
+
+def _decode_long_running_tool_ids(
+    long_running_tool_ids_json: Optional[str],
+) -> Set[str]:
+  if not long_running_tool_ids_json:
+    return set()
+  return set(_json_loads(long_running_tool_ids_json))
+
+
+def _decode_actions(actions: Optional[Dict[str, Any]]) -> EventActions:
+  if not actions:
+    return EventActions()
+  if isinstance(actions, (bytes, memoryview)):
+    # A PostgreSQL actions column that is still BYTEA.
+    raise ValueError(_PICKLED_ACTIONS_ERROR)
+  return EventActions.model_validate(actions)
+
+
 def _extract_state_delta(state: Dict[str, Any]):
   app_state_delta = {}
   user_state_delta = {}
   session_state_delta = {}
   if state:
-    for key in state.keys():
-      if key.startswith(State.APP_PREFIX):
-        app_state_delta[key.removeprefix(State.APP_PREFIX)] = state[key]
-      elif key.startswith(State.USER_PREFIX):
-        user_state_delta[key.removeprefix(State.USER_PREFIX)] = state[key]
-      elif not key.startswith(State.TEMP_PREFIX):
-        session_state_delta[key] = state[key]
+    for key, value in state.items():
+      if key[:_APP_PREFIX_LEN] == State.APP_PREFIX:
+        app_state_delta[key[_APP_PREFIX_LEN:]] = value
+      elif key[:_USER_PREFIX_LEN] == State.USER_PREFIX:
+        user_state_delta[key[_USER_PREFIX_LEN:]] = value
+      elif key[:_TEMP_PREFIX_LEN] != State.TEMP_PREFIX:
+        session_state_delta[key] = value
   return app_state_delta, user_state_delta, session_state_delta
 
 
 def _merge_state(app_state, user_state, session_state):
-  # Merge states for response
-  merged_state = copy.deepcopy(session_state)
-  for key in app_state.keys():
-    merged_state[State.APP_PREFIX + key] = app_state[key]
-  for key in user_state.keys():
-    merged_state[State.USER_PREFIX + key] = user_state[key]
+  # Merge states for response. The merged dict is new, but nested values are
+  # shared with the inputs rather than deep-copied: the inputs are freshly
+  # deserialized rows (or the caller's initial state) that are never written
+  # back, so callers must not rely on nested mutations being isolated.
+  merged_state = dict(session_state)
+  merged_state.update(
+      (State.APP_PREFIX + key, value) for key, value in app_state.items()
+  )
+  merged_state.update(
+      (State.USER_PREFIX + key, value) for key, value in user_state.items()
+  )
   return merged_state
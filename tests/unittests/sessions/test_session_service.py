@@ -12,15 +12,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+from datetime import datetime
 import enum
+import pickle
 
 from google.adk.events import Event
 from google.adk.events import EventActions
 from google.adk.sessions import DatabaseSessionService
 from google.adk.sessions import InMemorySessionService
 from google.adk.sessions.base_session_service import GetSessionConfig
+from google.adk.sessions.database_session_service import migrate_pickled_actions
+from google.adk.sessions.database_session_service import StorageEvent
 from google.genai import types
 import pytest
+from sqlalchemy import LargeBinary
+from sqlalchemy import type_coerce
+from sqlalchemy import update
+from sqlalchemy.exc import StatementError
 
 
 class SessionServiceType(enum.Enum):
@@ -377,3 +386,178 @@ async def test_get_session_with_config(service_type):
   )
   events = session.events
   assert len(events) == num_test_events - after_timestamp + 1
+
+
+@pytest.mark.asyncio
+async def test_migrate_pickled_actions():
+  session_service = get_session_service(SessionServiceType.DATABASE)
+  app_name = 'my_app'
+  user_id = 'user'
+
+  session = await session_service.create_session(
+      app_name=app_name, user_id=user_id
+  )
+  actions = [
+      EventActions(state_delta={'key': f'value{i}'}, escalate=True)
+      for i in range(3)
+  ]
+  events = [
+      Event(invocation_id='invocation', author='user', actions=a)
+      for a in actions
+  ]
+  await session_service.append_events(session=session, events=events)
+
+  # Simulate rows written by a version that pickled the actions.
+  storage_events = StorageEvent.__table__
+  with session_service.db_engine.begin() as connection:
+    for event in events[:2]:
+      connection.execute(
+          update(storage_events)
+          .where(storage_events.c.id == event.id)
+          .values(actions=type_coerce(pickle.dumps(event.actions), LargeBinary))
+      )
+
+  with pytest.raises(ValueError, match='migrate_pickled_actions'):
+    await session_service.get_session(
+        app_name=app_name, user_id=user_id, session_id=session.id
+    )
+
+  assert migrate_pickled_actions(session_service.db_engine, batch_size=1) == 2
+  assert migrate_pickled_actions(session_service.db_engine) == 0
+
+  session = await session_service.get_session(
+      app_name=app_name, user_id=user_id, session_id=session.id
+  )
+  assert [e.actions for e in session.events] == actions
+
+
+@pytest.mark.asyncio
+async def test_append_events():
+  session_service = get_session_service(SessionServiceType.DATABASE)
+  app_name = 'my_app'
+  user_id = 'user'
+
+  session = await session_service.create_session(
+      app_name=app_name, user_id=user_id
+  )
+  events = [
+      Event(
+          author='user',
+          timestamp=i,
+          actions=EventActions(
+              state_delta={'key': f'value{i}', f'app:key{i}': 'value'}
+          ),
+      )
+      for i in range(1, 4)
+  ]
+  events.append(Event(author='user', timestamp=4, partial=True))
+  await session_service.append_events(session=session, events=events)
+
+  assert len(session.events) == 3
+  assert session.state['key'] == 'value3'
+
+  stored_session = await session_service.get_session(
+      app_name=app_name, user_id=user_id, session_id=session.id
+  )
+  assert stored_session.state == session.state
+  assert [e.id for e in stored_session.events] == [e.id for e in events[:3]]
+
+
+@pytest.mark.asyncio
+async def test_database_session_state_with_large_int():
+  session_service = get_session_service(SessionServiceType.DATABASE)
+  app_name = 'my_app'
+  user_id = 'user'
+  state = {'big': 2**70, 'negative': -(2**63) - 1, 'digits': '1' * 20}
+
+  session = await session_service.create_session(
+      app_name=app_name, user_id=user_id, state=state
+  )
+  stored_session = await session_service.get_session(
+      app_name=app_name, user_id=user_id, session_id=session.id
+  )
+  assert stored_session.state == state
+
+
+@pytest.mark.asyncio
+async def test_database_session_state_rejects_datetime():
+  session_service = get_session_service(SessionServiceType.DATABASE)
+
+  with pytest.raises(StatementError) as excinfo:
+    await session_service.create_session(
+        app_name='my_app', user_id='user', state={'now': datetime.now()}
+    )
+  assert isinstance(excinfo.value.orig, TypeError)
+
+
+@pytest.mark.asyncio
+async def test_async_database_session_service():
+  session_service = DatabaseSessionService('sqlite+aiosqlite:///:memory:')
+  app_name = 'my_app'
+  user_id = 'user'
+
+  session = await session_service.create_session(
+      app_name=app_name, user_id=user_id, state={'key': 'value'}
+  )
+  event = Event(
+      invocation_id='invocation',
+      author='user',
+      content=types.Content(role='user', parts=[types.Part(text='text')]),
+      actions=EventActions(state_delta={'app:key': 'value'}),
+  )
+  await session_service.append_event(session=session, event=event)
+
+  stored_session = await session_service.get_session(
+      app_name=app_name, user_id=user_id, session_id=session.id
+  )
+  assert stored_session.state == {'key': 'value', 'app:key': 'value'}
+  assert stored_session.events[0].content == event.content
+
+  list_sessions_response = await session_service.list_sessions(
+      app_name=app_name, user_id=user_id
+  )
+  assert [s.id for s in list_sessions_response.sessions] == [session.id]
+
+  await session_service.delete_session(
+      app_name=app_name, user_id=user_id, session_id=session.id
+  )
+  assert not await session_service.get_session(
+      app_name=app_name, user_id=user_id, session_id=session.id
+  )
+
+
+@pytest.mark.asyncio
+async def test_database_session_service_concurrent_writes(tmp_path):
+  # A file database uses a connection pool, so calls run in the executor.
+  session_service = DatabaseSessionService(
+      f'sqlite:///{tmp_path / "sessions.db"}'
+  )
+  assert session_service._run_in_executor
+  app_name = 'my_app'
+  user_id = 'user'
+
+  sessions = await asyncio.gather(*(
+      session_service.create_session(
+          app_name=app_name, user_id=user_id, state={'index': i}
+      )
+      for i in range(8)
+  ))
+  events = [
+      Event(
+          invocation_id='invocation',
+          author='user',
+          actions=EventActions(state_delta={'key': f'value{i}'}),
+      )
+      for i in range(len(sessions))
+  ]
+  await asyncio.gather(*(
+      session_service.append_event(session=session, event=event)
+      for session, event in zip(sessions, events)
+  ))
+
+  for i, (session, event) in enumerate(zip(sessions, events)):
+    stored_session = await session_service.get_session(
+        app_name=app_name, user_id=user_id, session_id=session.id
+    )
+    assert stored_session.state == {'index': i, 'key': f'value{i}'}
+    assert [e.id for e in stored_session.events] == [event.id]
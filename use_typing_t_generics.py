@@ -1,89 +1,85 @@
 import os
 import re
 import argparse
-
-# Patterns to find and their replacements
-# Using raw strings for regex patterns to handle backslashes correctly
-REPLACEMENT_PATTERNS = {
-    # Match 'T.List[' not preceded by a dot (to avoid T.list[) or alphanumeric char (to avoid mylist[)
-    r"(?<![\w.])list\[": r"T.List[",
-    r"(?<![\w.])dict\[": r"T.Dict[",
-    r"(?<![\w.])tuple\[": r"T.Tuple[",
-    r"(?<![\w.])set\[": r"T.Set[",
-    r"(?<![\w.])frozenset\[": r"T.FrozenSet[",
-    r"(?<![\w.])type\[": r"T.Type[",
+import multiprocessing
+
+# Match e.g. 'list[' not preceded by a dot (to avoid T.list[) or alphanumeric
+# char (to avoid mylist[). All builtins are fused into a single alternation so
+# each file is scanned once; the captured name is looked up in
+# GENERIC_REPLACEMENTS. The leading lookahead on the possible first letters
+# lets the engine skip most positions before evaluating the lookbehind. On
+# bytes \w is ASCII-only, so any UTF-8 lead or continuation byte also blocks
+# the match (to avoid e.g. λdict[).
+GENERIC_PATTERN = re.compile(rb"(?=[dflst])(?<![\w.\x80-\xff])(list|dict|tuple|set|frozenset|type)\[")
+GENERIC_REPLACEMENTS = {
+    b"list": b"T.List[",
+    b"dict": b"T.Dict[",
+    b"tuple": b"T.Tuple[",
+    b"set": b"T.Set[",
+    b"frozenset": b"T.FrozenSet[",
+    b"type": b"T.Type[",
 }
 
-IMPORT_TYPING_AS_T = "import typing as T"
+IMPORT_TYPING_AS_T = b"import typing as T"
+
+# The import goes after the last 'from __future__' import, or else after a
+# leading shebang and/or encoding comment.
+FUTURE_IMPORT_PATTERN = re.compile(rb"^from __future__ import[^\n]*(?:\n|\Z)", re.MULTILINE)
+HEADER_PATTERN = re.compile(rb"\A(?:#![^\n]*(?:\n|\Z))?(?:# -\*- coding:[^\n]*(?:\n|\Z))?")
+BLANK_LINE_PATTERN = re.compile(rb"[ \t\f\v\r]*(?:\n|\Z)")
+
+def _replace_generic(match):
+    return GENERIC_REPLACEMENTS[match.group(1)]
 
-def add_typing_import(lines):
+def _detect_newline(content):
+    """Returns the file's line ending so inserted lines don't mix styles."""
+    return b"\r\n" if b"\r\n" in content else b"\n"
+
+def add_typing_import(content):
     """Adds 'import typing as T' to the file content if not already present."""
-    import_exists = any(IMPORT_TYPING_AS_T in line for line in lines)
-    if import_exists:
-        return lines, False
+    if IMPORT_TYPING_AS_T in content:
+        return content, False
 
-    future_import_indices = [i for i, line in enumerate(lines) if line.startswith("from __future__ import")]
-    
     insert_pos = 0
-    if future_import_indices:
-        insert_pos = max(future_import_indices) + 1
-    else:
-        # Check for shebang or encoding comment
-        if lines and lines[0].startswith("#!"):
-            insert_pos = 1
-            if len(lines) > 1 and lines[1].startswith("# -*- coding:"):
-                insert_pos = 2
-        elif lines and lines[0].startswith("# -*- coding:"):
-            insert_pos = 1
-
-    # Ensure a blank line after the import if it's not the last line and not followed by a blank line
-    lines.insert(insert_pos, IMPORT_TYPING_AS_T)
-    if insert_pos < len(lines) -1 and lines[insert_pos+1].strip() != "":
-        lines.insert(insert_pos + 1, "") # Add a blank line after the import
-    elif insert_pos == len(lines) -1: # if import is the last line, add newline after it
-        pass # Handled by join later
-
-    return lines, True
+    for match in FUTURE_IMPORT_PATTERN.finditer(content):
+        insert_pos = match.end()
+    if not insert_pos:
+        insert_pos = HEADER_PATTERN.match(content).end()
+
+    newline = _detect_newline(content)
+    import_line = IMPORT_TYPING_AS_T + newline
+    if insert_pos and content[insert_pos - 1:insert_pos] != b"\n":
+        import_line = newline + import_line # The preceding line had no newline
+    # Ensure a blank line after the import if it's not followed by a blank line
+    if insert_pos < len(content) and not BLANK_LINE_PATTERN.match(content, insert_pos):
+        import_line += newline
+
+    return content[:insert_pos] + import_line + content[insert_pos:], True
 
 def process_file(filepath):
     """Processes a single Python file for type hint replacements."""
+    # Work on raw bytes: the patterns are ASCII, so there's no need to decode.
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
+        with open(filepath, 'rb') as f:
             original_content = f.read()
     except Exception as e:
         print(f"Error reading file {filepath}: {e}")
         return
 
-    modified_content = original_content
-    replacements_made = False
-
-    for pattern, replacement in REPLACEMENT_PATTERNS.items():
-        new_content, num_subs = re.subn(pattern, replacement, modified_content)
-        if num_subs > 0:
-            modified_content = new_content
-            replacements_made = True
-
-    lines = modified_content.splitlines()
-    import_added = False
-    if replacements_made:
-        lines, import_added = add_typing_import(lines)
-        modified_content = "\n".join(lines)
-        if not original_content.endswith("\n") and modified_content.endswith("\n") and len(lines) > 0 : # if original didn't end with newline but we added one
-             if lines[-1] == "": # check if the last line is the blank line we added
-                modified_content = "\n".join(lines[:-1]) # remove it
-        elif not original_content.endswith("\n") and not modified_content.endswith("\n") and len(lines) > 0:
-            modified_content += "\n" # ensure a final newline if there was content
-        elif original_content.endswith("\n") and not modified_content.endswith("\n") and len(lines) > 0:
-            modified_content += "\n" # ensure final newline if original had it
-
-
-    if replacements_made or import_added:
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(modified_content)
-            print(f"Modified: {filepath}")
-        except Exception as e:
-            print(f"Error writing file {filepath}: {e}")
+    modified_content, num_subs = GENERIC_PATTERN.subn(_replace_generic, original_content)
+    if num_subs == 0:
+        return
+
+    modified_content, _ = add_typing_import(modified_content)
+    if not modified_content.endswith(b"\n"):
+        modified_content += _detect_newline(modified_content) # ensure a final newline
+
+    try:
+        with open(filepath, 'wb') as f:
+            f.write(modified_content)
+        print(f"Modified: {filepath}")
+    except Exception as e:
+        print(f"Error writing file {filepath}: {e}")
 
 def main():
     parser = argparse.ArgumentParser(description="Replace built-in generic types with T.Aliased versions and add 'import typing as T'.")
@@ -94,10 +90,15 @@ def main():
         print(f"Error: Directory '{args.directory}' not found.")
         return
 
-    for root, _, files in os.walk(args.directory):
-        for filename in files:
-            if filename.endswith(".py"):
-                process_file(os.path.join(root, filename))
+    filepaths = [
+        os.path.join(root, filename)
+        for root, _, files in os.walk(args.directory)
+        for filename in files
+        if filename.endswith(".py")
+    ]
+    # Files are independent, so spread them across all cores.
+    with multiprocessing.Pool() as pool:
+        pool.map(process_file, filepaths, chunksize=32)
 
 if __name__ == "__main__":
     main()